@@ -0,0 +1,143 @@
+"""Persistent analysis cache backed by SQLite."""
+
+import os
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Bump whenever the shape or content of cached analysis results changes so that
+# entries written by an older version are discarded instead of served.
+_SCHEMA_VERSION = 5
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS analysis (
+    file_path TEXT PRIMARY KEY,
+    sha256 BLOB NOT NULL,
+    symbols BLOB NOT NULL,
+    deps BLOB NOT NULL,
+    by_name BLOB NOT NULL,
+    structure TEXT NOT NULL
+)
+"""
+
+
+def default_cache_path() -> Path:
+    """Get the default location of the cache database.
+
+    Returns:
+        Path under ``$XDG_CACHE_HOME`` (or ``~/.cache``) for the cache database
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "mcp-gdscript" / "analysis.sqlite3"
+
+
+class AnalysisCache:
+    """Cache of per-file analysis results keyed by (file path, content hash).
+
+    A cached entry is only returned when the SHA-256 of the current file contents
+    matches the one it was stored with, so edited files are re-analyzed implicitly.
+    If the database cannot be opened the cache silently becomes a no-op.
+    """
+
+    def __init__(self, db_path: Union[str, Path, None] = None):
+        """Open (or create) the cache database.
+
+        Args:
+            db_path: Path to the SQLite database, or ":memory:". Defaults to
+                default_cache_path()
+        """
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        try:
+            if db_path is None:
+                db_path = default_cache_path()
+            if str(db_path) != ":memory:":
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+            conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS analysis")
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            conn.execute(_CREATE_TABLE)
+            conn.commit()
+            self._conn = conn
+        except (OSError, sqlite3.Error):
+            self._conn = None
+
+    def get(self, file_path: str, digest: bytes) -> Optional[dict[str, Any]]:
+        """Look up the analysis of a file.
+
+        Args:
+            file_path: Path of the analyzed file
+            digest: SHA-256 digest of the current file contents
+
+        Returns:
+            Dictionary with "symbols", "dependencies", "by_name" and "structure",
+            or None on a miss
+        """
+        if self._conn is None:
+            return None
+
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT symbols, deps, by_name, structure FROM analysis"
+                    " WHERE file_path = ? AND sha256 = ?",
+                    (file_path, digest),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+
+        try:
+            return {
+                "symbols": pickle.loads(row[0]),
+                "dependencies": pickle.loads(row[1]),
+                "by_name": pickle.loads(row[2]),
+                "structure": row[3],
+            }
+        except Exception:
+            # Entries pickled by an incompatible version can fail with almost any
+            # exception (AttributeError, ModuleNotFoundError, TypeError, ...)
+            return None
+
+    def put(self, file_path: str, digest: bytes, analysis: dict[str, Any]) -> None:
+        """Store the analysis of a file, replacing any previous entry for the path.
+
+        Args:
+            file_path: Path of the analyzed file
+            digest: SHA-256 digest of the analyzed file contents
+            analysis: Dictionary with "symbols", "dependencies", "by_name" and "structure"
+        """
+        if self._conn is None:
+            return
+
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analysis"
+                    " (file_path, sha256, symbols, deps, by_name, structure)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        file_path,
+                        digest,
+                        pickle.dumps(analysis["symbols"], pickle.HIGHEST_PROTOCOL),
+                        pickle.dumps(analysis["dependencies"], pickle.HIGHEST_PROTOCOL),
+                        pickle.dumps(analysis["by_name"], pickle.HIGHEST_PROTOCOL),
+                        analysis["structure"],
+                    ),
+                )
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
@@ -1,8 +1,120 @@
 """GDScript parser wrapper using tree-sitter."""
 
-from typing import Any, Optional
-from tree_sitter_language_pack import get_language, get_parser
-from tree_sitter import Tree, Node
+import threading
+from functools import partial
+from typing import Any, Callable, NamedTuple, Optional, Union
+from tree_sitter_language_pack import get_language
+from tree_sitter import Language, Parser, Query, QueryCursor, Tree, Node
+
+# Captures every symbol name and dependency path that extract_all reports
+_EXTRACT_QUERY_SOURCE = """
+(class_definition name: (name) @class.name)
+(function_definition name: (name) @function.name)
+(variable_statement name: (name) @variable.name)
+(signal_statement (name) @signal.name)
+(enum_definition name: (name) @enum.name)
+(extends_statement (type) @extends.type)
+(extends_statement (string) @extends.path)
+(call (identifier) @fn (arguments . (string) @preload.path) (#eq? @fn "preload"))
+"""
+
+# Loaded and compiled once per process and shared by all parser instances
+LANGUAGE: Language = get_language("gdscript")
+EXTRACT_QUERY: Query = Query(LANGUAGE, _EXTRACT_QUERY_SOURCE)
+
+# Captures every node that can reference a symbol by name, for find_references
+REFERENCE_QUERY: Query = Query(LANGUAGE, "[(identifier) (name)] @ref")
+
+# Symbol categories shown by get_structure, in order, with their section headings
+_STRUCTURE_SECTIONS = (
+    ("classes", "Classes:"),
+    ("functions", "\nFunctions:"),
+    ("signals", "\nSignals:"),
+    ("variables", "\nVariables:"),
+    ("enums", "\nEnums:"),
+)
+
+_thread_local = threading.local()
+
+SourceCode = Union[str, bytes, None]
+
+
+class Symbol(NamedTuple):
+    """A symbol definition: its name and the 1-based line / 0-based column it starts at."""
+
+    name: str
+    line: int
+    column: int
+
+
+def source_bytes(tree: Tree, code: SourceCode = None) -> bytes:
+    """Get the source bytes that the byte offsets of tree's nodes index into.
+
+    Args:
+        tree: The parsed syntax tree
+        code: The source code the tree was parsed from, if available
+
+    Returns:
+        UTF-8 encoded source code
+    """
+    if code is None:
+        # The root node starts at the first token; pad so that offsets still line up
+        root = tree.root_node
+        return b"\0" * root.start_byte + root.text
+    if isinstance(code, str):
+        return code.encode("utf-8")
+    return code
+
+
+def _common_prefix_length(a: bytes, b: bytes) -> int:
+    """Get the length of the longest common prefix of two byte strings.
+
+    Binary search over startswith() with memoryview slices, so each probe is a
+    single memcmp and no bytes are copied.
+    """
+    view = memoryview(b)
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a.startswith(view[:mid]):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(a: bytes, b: bytes, limit: int) -> int:
+    """Get the length (at most limit) of the longest common suffix of two byte strings."""
+    view = memoryview(b)
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a.endswith(view[len(b) - mid:]):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _point_at(code: bytes, offset: int) -> tuple[int, int]:
+    """Get the (row, byte column) tree-sitter point of a byte offset."""
+    row = code.count(b"\n", 0, offset)
+    return row, offset - (code.rfind(b"\n", 0, offset) + 1)
+
+
+def get_thread_parser() -> Parser:
+    """Get the tree-sitter parser of the calling thread.
+
+    A Parser must not be used by several threads at once, so each thread
+    lazily creates its own.
+
+    Returns:
+        tree_sitter.Parser for GDScript owned by the current thread
+    """
+    parser = getattr(_thread_local, "parser", None)
+    if parser is None:
+        parser = _thread_local.parser = Parser(LANGUAGE)
+    return parser
 
 
 class GDScriptParser:
@@ -10,143 +122,215 @@ class GDScriptParser:
 
     def __init__(self):
         """Initialize the GDScript parser."""
-        self.language = get_language("gdscript")
-        self.parser = get_parser("gdscript")
+        self.language = LANGUAGE
+        self.extract_query = EXTRACT_QUERY
+
+        # Capture name -> handler dispatch table used by extract_all
+        self._handlers: dict[str, Callable[[Node, bytes, dict[str, Any]], None]] = {
+            "class.name": partial(self._handle_symbol, "classes"),
+            "function.name": partial(self._handle_symbol, "functions"),
+            "variable.name": partial(self._handle_symbol, "variables"),
+            "signal.name": partial(self._handle_symbol, "signals"),
+            "enum.name": partial(self._handle_symbol, "enums"),
+            "extends.type": self._handle_extends_type,
+            "extends.path": partial(self._handle_path, "extends"),
+            "preload.path": partial(self._handle_path, "preload"),
+        }
+
+    @property
+    def parser(self) -> Parser:
+        """The tree-sitter parser of the calling thread."""
+        return get_thread_parser()
 
-    def parse(self, code: str) -> Tree:
+    def parse(self, code: Union[str, bytes]) -> Tree:
         """Parse GDScript code and return the syntax tree.
 
         Args:
-            code: GDScript source code as string
+            code: GDScript source code as string or UTF-8 encoded bytes
 
         Returns:
             tree_sitter.Tree: The parsed syntax tree
         """
-        return self.parser.parse(code.encode("utf-8"))
+        if isinstance(code, str):
+            code = code.encode("utf-8")
+        return self.parse_bytes(code)
 
-    def get_symbols(self, tree: Tree) -> dict[str, Any]:
-        """Extract symbols (classes, functions, etc.) from the tree.
+    def parse_bytes(self, code: bytes, old_tree: Optional[Tree] = None) -> Tree:
+        """Parse UTF-8 encoded GDScript code and return the syntax tree.
+
+        Args:
+            code: GDScript source code as UTF-8 encoded bytes
+            old_tree: A previous tree already edited to match code, whose
+                unchanged parts tree-sitter reuses
+
+        Returns:
+            tree_sitter.Tree: The parsed syntax tree
+        """
+        if old_tree is None:
+            return self.parser.parse(code)
+        return self.parser.parse(code, old_tree)
+
+    def reparse(self, old_tree: Tree, old_code: bytes, new_code: bytes) -> Tree:
+        """Parse a new version of previously parsed code incrementally.
+
+        The changed region is taken to be everything between the longest common
+        prefix and suffix of the two versions. A copy of old_tree is edited to
+        match and handed to tree-sitter, so old_tree itself is left untouched.
+
+        Args:
+            old_tree: Tree parsed from old_code
+            old_code: Previous UTF-8 encoded source code
+            new_code: New UTF-8 encoded source code
+
+        Returns:
+            tree_sitter.Tree: The syntax tree of new_code
+        """
+        start = _common_prefix_length(old_code, new_code)
+        max_suffix = min(len(old_code), len(new_code)) - start
+        suffix = _common_suffix_length(old_code, new_code, max_suffix)
+        old_end = len(old_code) - suffix
+        new_end = len(new_code) - suffix
+
+        tree = old_tree.copy()
+        tree.edit(
+            start_byte=start,
+            old_end_byte=old_end,
+            new_end_byte=new_end,
+            start_point=_point_at(old_code, start),
+            old_end_point=_point_at(old_code, old_end),
+            new_end_point=_point_at(new_code, new_end),
+        )
+        return self.parse_bytes(new_code, tree)
+
+    def extract_all(self, tree: Tree, code: SourceCode = None) -> dict[str, Any]:
+        """Extract symbols and dependencies from the tree in a single traversal.
 
         Args:
             tree: The parsed syntax tree
+            code: The source code the tree was parsed from. Passing it avoids
+                recovering it from the tree
 
         Returns:
-            Dictionary with symbol information
+            Dictionary with "symbols" (lists of Symbol per category, see
+            symbols_as_dicts), "dependencies" (as returned by get_dependencies)
+            and "by_name" (as returned by index_symbols)
         """
-        symbols = {
-            "classes": [],
-            "functions": [],
-            "variables": [],
-            "signals": [],
-            "enums": [],
+        result = {
+            "symbols": {
+                "classes": [],
+                "functions": [],
+                "variables": [],
+                "signals": [],
+                "enums": [],
+            },
+            "dependencies": {
+                "extends": [],
+                "preload": [],
+                "import": [],
+            },
         }
 
-        self._extract_symbols(tree.root_node, symbols)
-        return symbols
+        self._extract_all(tree, source_bytes(tree, code), result)
+        result["by_name"] = self.index_symbols(result["symbols"])
+        return result
 
-    def _extract_symbols(self, node: Node, symbols: dict[str, Any], depth: int = 0) -> None:
-        """Recursively extract symbols from tree nodes.
+    def get_symbols(self, tree: Tree, code: SourceCode = None) -> dict[str, Any]:
+        """Extract symbols (classes, functions, etc.) from the tree.
 
         Args:
-            node: Current tree node
-            symbols: Symbol dictionary to populate
-            depth: Current recursion depth
+            tree: The parsed syntax tree
+            code: The source code the tree was parsed from, if available
+
+        Returns:
+            Dictionary with symbol information
         """
-        if depth > 20:  # Prevent infinite recursion
-            return
-
-        node_type = node.type
-
-        if node_type == "class_definition":
-            name = self._get_node_text(node, "name")
-            if name:
-                symbols["classes"].append({
-                    "name": name,
-                    "line": node.start_point[0] + 1,
-                    "column": node.start_point[1],
-                })
-
-        elif node_type == "function_definition":
-            name = self._get_node_text(node, "name")
-            if name:
-                symbols["functions"].append({
-                    "name": name,
-                    "line": node.start_point[0] + 1,
-                    "column": node.start_point[1],
-                })
-
-        elif node_type == "signal_statement":
-            name = self._get_node_text(node, "name")
-            if name:
-                symbols["signals"].append({
-                    "name": name,
-                    "line": node.start_point[0] + 1,
-                    "column": node.start_point[1],
-                })
-
-        elif node_type == "enum_definition":
-            name = self._get_node_text(node, "name")
-            if name:
-                symbols["enums"].append({
-                    "name": name,
-                    "line": node.start_point[0] + 1,
-                    "column": node.start_point[1],
-                })
-
-        elif node_type in ("assignment", "variable_statement"):
-            name = self._get_node_text(node, "name")
-            if name:
-                symbols["variables"].append({
-                    "name": name,
-                    "line": node.start_point[0] + 1,
-                    "column": node.start_point[1],
-                })
-
-        # Recursively process child nodes
-        for child in node.children:
-            self._extract_symbols(child, symbols, depth + 1)
-
-    def _get_node_text(self, node: Node, child_name: str = None) -> Optional[str]:
-        """Get text content from a node or its named child.
+        return self.symbols_as_dicts(self.extract_all(tree, code)["symbols"])
+
+    def symbols_as_dicts(self, symbols: dict[str, list[Symbol]]) -> dict[str, Any]:
+        """Convert extracted symbols to JSON-serializable dictionaries.
 
         Args:
-            node: The tree node
-            child_name: Name of the child node to extract text from
+            symbols: The "symbols" entry of an extract_all result
 
         Returns:
-            Text content or None
+            Dictionary with a list of {"name", "line", "column"} per category
         """
-        target_node = node
+        return {
+            category: [sym._asdict() for sym in syms] for category, syms in symbols.items()
+        }
 
-        if child_name:
-            # First try field_by_field_name
-            target_node = node.child_by_field_name(child_name)
+    def _extract_all(self, tree: Tree, source: bytes, result: dict[str, Any]) -> None:
+        """Run the extraction query over the tree and dispatch its captures.
 
-            # If not found, search by node type
-            if not target_node:
-                for child in node.children:
-                    if child.type == child_name:
-                        target_node = child
-                        break
+        The pattern matching runs inside tree-sitter, so Python only visits the
+        captured nodes, in document order. Node text is sliced from the source
+        by byte offsets rather than read through Node.text.
 
-            if not target_node:
-                return None
+        Args:
+            tree: The parsed syntax tree
+            source: UTF-8 encoded source code of the tree
+            result: Result dictionary to populate
+        """
+        handlers = self._handlers
 
-        if target_node.type == "identifier":
-            return target_node.text.decode("utf-8") if isinstance(target_node.text, bytes) else str(target_node.text)
+        for _, captures in QueryCursor(self.extract_query).matches(tree.root_node):
+            for capture_name, nodes in captures.items():
+                handler = handlers.get(capture_name)
+                if handler:
+                    for node in nodes:
+                        handler(node, source, result)
 
-        # If the node type is "name", return its text directly
-        if target_node.type == "name":
-            return target_node.text.decode("utf-8") if isinstance(target_node.text, bytes) else str(target_node.text)
+    def _handle_symbol(
+        self, category: str, node: Node, source: bytes, result: dict[str, Any]
+    ) -> None:
+        """Record a symbol from its captured name node.
+
+        Args:
+            category: Symbol category to add the symbol to (e.g. "functions")
+            node: The name node; its parent is the definition
+            source: UTF-8 encoded source code
+            result: Result dictionary to populate
+        """
+        row, column = node.parent.start_point
+        result["symbols"][category].append(
+            Symbol(source[node.start_byte:node.end_byte].decode("utf-8"), row + 1, column)
+        )
 
-        # Try to get the first identifier child
-        for child in target_node.children:
-            if child.type == "identifier":
-                return child.text.decode("utf-8") if isinstance(child.text, bytes) else str(child.text)
+    def _handle_extends_type(self, node: Node, source: bytes, result: dict[str, Any]) -> None:
+        """Record the base type of an extends statement.
 
-        return None
+        Args:
+            node: The captured type node
+            source: UTF-8 encoded source code
+            result: Result dictionary to populate
+        """
+        result["dependencies"]["extends"].append(
+            source[node.start_byte:node.end_byte].decode("utf-8")
+        )
+
+    def _handle_path(
+        self, category: str, node: Node, source: bytes, result: dict[str, Any]
+    ) -> None:
+        """Record a dependency given as a string literal path.
 
-    def get_structure(self, tree: Tree, code: str) -> str:
+        Args:
+            category: Dependency category to add the path to (e.g. "preload")
+            node: The captured string node
+            source: UTF-8 encoded source code
+            result: Result dictionary to populate
+        """
+        # The first and last children are the delimiters, so slicing between them
+        # drops quotes (and prefixes such as r"") without scanning the text
+        start, end = node.start_byte, node.end_byte
+        if node.child_count >= 2:
+            start = node.child(0).end_byte
+            end = node.child(node.child_count - 1).start_byte
+
+        path = source[start:end].decode("utf-8")
+        if path:
+            result["dependencies"][category].append(path)
+
+    def get_structure(self, tree: Tree, code: SourceCode) -> str:
         """Get a high-level structure overview of the file.
 
         Args:
@@ -156,33 +340,24 @@ class GDScriptParser:
         Returns:
             Formatted structure string
         """
-        symbols = self.get_symbols(tree)
-        structure_lines = ["=== GDScript File Structure ===\n"]
+        return self.format_structure(self.extract_all(tree, code)["symbols"])
 
-        if symbols["classes"]:
-            structure_lines.append("Classes:")
-            for cls in symbols["classes"]:
-                structure_lines.append(f"  - {cls['name']} (line {cls['line']})")
+    def format_structure(self, symbols: dict[str, list[Symbol]]) -> str:
+        """Format already extracted symbols as a structure overview.
 
-        if symbols["functions"]:
-            structure_lines.append("\nFunctions:")
-            for func in symbols["functions"]:
-                structure_lines.append(f"  - {func['name']} (line {func['line']})")
-
-        if symbols["signals"]:
-            structure_lines.append("\nSignals:")
-            for sig in symbols["signals"]:
-                structure_lines.append(f"  - {sig['name']} (line {sig['line']})")
+        Args:
+            symbols: The "symbols" entry of an extract_all result
 
-        if symbols["variables"]:
-            structure_lines.append("\nVariables:")
-            for var in symbols["variables"]:
-                structure_lines.append(f"  - {var['name']} (line {var['line']})")
+        Returns:
+            Formatted structure string
+        """
+        structure_lines = ["=== GDScript File Structure ===\n"]
 
-        if symbols["enums"]:
-            structure_lines.append("\nEnums:")
-            for enum in symbols["enums"]:
-                structure_lines.append(f"  - {enum['name']} (line {enum['line']})")
+        for category, heading in _STRUCTURE_SECTIONS:
+            syms = symbols[category]
+            if syms:
+                structure_lines.append(heading)
+                structure_lines.extend([f"  - {sym.name} (line {sym.line})" for sym in syms])
 
         return "\n".join(structure_lines)
 
@@ -196,169 +371,90 @@ class GDScriptParser:
         Returns:
             Symbol information or None if not found
         """
-        symbols = self.get_symbols(tree)
+        entry = self.extract_all(tree)["by_name"].get(symbol_name)
+        return self.symbol_info(entry) if entry else None
 
-        for sym_type in ["classes", "functions", "signals", "variables", "enums"]:
-            for sym in symbols[sym_type]:
-                if sym["name"] == symbol_name:
-                    return {
-                        "type": sym_type[:-1],  # Remove trailing 's'
-                        **sym,
-                    }
+    def index_symbols(self, symbols: dict[str, list[Symbol]]) -> dict[str, tuple[str, Symbol]]:
+        """Build a lookup table from symbol name to symbol type and definition.
 
-        return None
-
-    def get_dependencies(self, tree: Tree, code: str) -> dict[str, list[str]]:
-        """Extract dependencies (extends, preload) from the file.
+        When a name is defined more than once, the first definition in the order
+        classes, functions, signals, variables, enums wins.
 
         Args:
-            tree: The parsed syntax tree
-            code: The original source code
+            symbols: The "symbols" entry of an extract_all result
 
         Returns:
-            Dictionary with lists of dependencies
+            Dictionary mapping each name to a (type, Symbol) tuple
         """
-        dependencies = {
-            "extends": [],
-            "preload": [],
-            "import": [],
-        }
+        by_name: dict[str, tuple[str, Symbol]] = {}
 
-        self._extract_dependencies(tree.root_node, dependencies)
-        return dependencies
+        for sym_type in ["classes", "functions", "signals", "variables", "enums"]:
+            type_name = sym_type[:-1]  # Remove trailing 's'
+            for sym in symbols[sym_type]:
+                if sym.name not in by_name:
+                    by_name[sym.name] = (type_name, sym)
 
-    def _extract_dependencies(self, node: Node, deps: dict[str, list[str]]) -> None:
-        """Recursively extract dependencies from tree nodes.
+        return by_name
 
-        Args:
-            node: Current tree node
-            deps: Dependencies dictionary to populate
-        """
-        node_type = node.type
-
-        # Check for extends statement
-        if node_type in ("extends_statement", "extend_statement"):
-            # For extends, the type is in the "type" child node
-            for child in node.children:
-                if child.type == "type":
-                    path = child.text.decode("utf-8") if isinstance(child.text, bytes) else str(child.text)
-                    if path:
-                        deps["extends"].append(path)
-                elif child.type == "identifier":
-                    path = child.text.decode("utf-8") if isinstance(child.text, bytes) else str(child.text)
-                    if path and path != "extends":
-                        deps["extends"].append(path)
-
-        # Check for preload function calls (both function_call and call node types)
-        elif node_type in ("function_call", "call"):
-            if self._is_preload_call(node):
-                path = self._extract_string_argument(node)
-                if path:
-                    deps["preload"].append(path)
-
-        # Check for import statements
-        elif node_type == "import_statement":
-            path = self._extract_string_value(node)
-            if path:
-                deps["import"].append(path)
-
-        # Recursively process child nodes
-        for child in node.children:
-            self._extract_dependencies(child, deps)
-
-    def _extract_string_value(self, node: Node) -> Optional[str]:
-        """Extract string value from a node.
+    def symbol_info(self, entry: tuple[str, Symbol]) -> dict[str, Any]:
+        """Convert a by_name entry to a JSON-serializable dictionary.
 
         Args:
-            node: The tree node
+            entry: A (type, Symbol) tuple from index_symbols
 
         Returns:
-            String value without quotes or None
+            Dictionary with "type", "name", "line" and "column"
         """
-        for child in node.children:
-            if child.type == "string":
-                text = child.text.decode("utf-8") if isinstance(child.text, bytes) else str(child.text)
-                # Remove quotes
-                return text.strip('"\'')
-        return None
+        sym_type, sym = entry
+        return {"type": sym_type, **sym._asdict()}
 
-    def _extract_string_argument(self, node: Node) -> Optional[str]:
-        """Extract string argument from a function call node.
+    def get_dependencies(self, tree: Tree, code: SourceCode) -> dict[str, list[str]]:
+        """Extract dependencies (extends, preload) from the file.
 
         Args:
-            node: The function call node
+            tree: The parsed syntax tree
+            code: The original source code
 
         Returns:
-            String value without quotes or None
+            Dictionary with lists of dependencies
         """
-        # Find arguments node
-        for child in node.children:
-            if child.type == "arguments":
-                for arg in child.children:
-                    if arg.type == "string":
-                        text = arg.text.decode("utf-8") if isinstance(arg.text, bytes) else str(arg.text)
-                        return text.strip('"\'')
-        return None
-
-    def _is_preload_call(self, node: Node) -> bool:
-        """Check if a function call is a preload call.
-
-        Args:
-            node: The function call node
+        return self.extract_all(tree, code)["dependencies"]
 
-        Returns:
-            True if this is a preload call
-        """
-        for child in node.children:
-            if child.type == "identifier":
-                text = child.text.decode("utf-8") if isinstance(child.text, bytes) else str(child.text)
-                if text == "preload":
-                    return True
-        return False
-
-    def find_references(self, tree: Tree, symbol_name: str) -> list[dict[str, Any]]:
+    def find_references(
+        self, tree: Tree, symbol_name: str, code: SourceCode = None
+    ) -> list[dict[str, Any]]:
         """Find all references to a symbol in the code.
 
         Args:
             tree: The parsed syntax tree
             symbol_name: Name of the symbol to find references for
+            code: The source code the tree was parsed from, if available
 
         Returns:
             List of reference locations with context
         """
-        references = []
-        self._find_references_recursive(tree.root_node, symbol_name, references)
-        return references
-
-    def _find_references_recursive(
-        self, node: Node, symbol_name: str, references: list[dict[str, Any]], depth: int = 0
-    ) -> None:
-        """Recursively find symbol references in tree nodes.
-
-        Args:
-            node: Current tree node
-            symbol_name: Name of the symbol to find
-            references: List to populate with references
-            depth: Current recursion depth
-        """
-        if depth > 20:  # Prevent infinite recursion
-            return
-
-        node_type = node.type
-
-        # Check if this is an identifier or name node matching the symbol
-        if node_type in ("identifier", "name"):
-            text = node.text.decode("utf-8") if isinstance(node.text, bytes) else str(node.text)
-            if text == symbol_name:
-                references.append(
-                    {
-                        "line": node.start_point[0] + 1,
-                        "column": node.start_point[1],
-                        "end_line": node.end_point[0] + 1,
-                        "end_column": node.end_point[1],
-                    }
-                )
-
-        # Recursively process child nodes
-        for child in node.children:
-            self._find_references_recursive(child, symbol_name, references, depth + 1)
+        source = source_bytes(tree, code)
+        name = symbol_name.encode("utf-8")
+        name_length = len(name)
+
+        # The query enumerates identifier/name nodes in C; Python only compares
+        # their bytes against the symbol name
+        captures = QueryCursor(REFERENCE_QUERY).captures(tree.root_node)
+        matches = [
+            node
+            for node in captures.get("ref", [])
+            if node.end_byte - node.start_byte == name_length
+            and source.startswith(name, node.start_byte)
+        ]
+        # Captures are not guaranteed to come back in document order
+        matches.sort(key=lambda node: node.start_byte)
+
+        return [
+            {
+                "line": node.start_point[0] + 1,
+                "column": node.start_point[1],
+                "end_line": node.end_point[0] + 1,
+                "end_column": node.end_point[1],
+            }
+            for node in matches
+        ]
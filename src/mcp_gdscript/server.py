@@ -39,9 +39,11 @@ class GDScriptMCPServer:
         @self.server.call_tool()
         async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
             """Handle tool calls."""
-            logger.info(f"Calling tool: {name} with arguments: {arguments}")
+            logger.info("Calling tool: %s with arguments: %s", name, arguments)
 
-            result = self.tools.handle_tool_call(name, arguments)
+            # Parsing is blocking work; run it off the event loop so other
+            # requests keep being served while a large file is analyzed
+            result = await asyncio.to_thread(self.tools.handle_tool_call, name, arguments)
 
             return CallToolResult(content=result.content, isError=result.isError)
 
@@ -1,30 +1,84 @@
 """MCP tools for GDScript analysis."""
 
+import functools
+import hashlib
 import json
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 from mcp.types import Tool, TextContent, CallToolResult
+from tree_sitter import Tree
 
+from .cache import AnalysisCache
 from .parser import GDScriptParser
 
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        """Serialize obj to indented JSON using orjson."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+except ImportError:
+
+    def _dumps(obj: Any) -> str:
+        """Serialize obj to indented JSON."""
+        return json.dumps(obj, indent=2)
+
+
+# File extensions accepted as GDScript sources
+_GD_SUFFIXES = frozenset({".gd", ".gdscript"})
+
+# Number of recently used files whose source and syntax tree are kept in memory
+_SOURCE_CACHE_SIZE = 128
+
 
 class GDScriptTools:
     """Collection of tools for GDScript analysis."""
 
-    def __init__(self):
-        """Initialize the tools."""
+    def __init__(self, cache_path: Union[str, Path, None] = None):
+        """Initialize the tools.
+
+        Args:
+            cache_path: Location of the persistent analysis cache database.
+                Defaults to a file under the XDG cache directory
+        """
         self.parser = GDScriptParser()
         self.project_root: Optional[Path] = None
         self._gdscript_files: list[Path] = []
+        # Guards project_root and _gdscript_files, which tool calls on worker
+        # threads read and replace as a pair
+        self._project_lock = threading.Lock()
+        self._tools_cache: Optional[list[Tool]] = None
+        self._cache = AnalysisCache(cache_path)
+
+        # Per-instance LRU caches keyed by (path, st_mtime_ns, st_size)
+        self._hash_source = functools.lru_cache(maxsize=_SOURCE_CACHE_SIZE)(
+            self._hash_source_uncached
+        )
+        self._load_and_parse = functools.lru_cache(maxsize=_SOURCE_CACHE_SIZE)(
+            self._load_and_parse_uncached
+        )
+
+        # (path, source code, tree) of the last file parsed, for incremental reparses
+        self._last_parse: Optional[tuple[str, bytes, Tree]] = None
 
     def get_tools(self) -> list[Tool]:
         """Get all available tools.
 
+        The definitions are built on the first call and reused afterwards.
+
         Returns:
             List of Tool definitions
         """
-        return [
+        if self._tools_cache is not None:
+            return self._tools_cache
+
+        self._tools_cache = [
             Tool(
                 name="analyze_gdscript_file",
                 description="Analyze a GDScript file and extract its structure (classes, functions, signals, variables, enums). Returns a comprehensive overview without reading the entire file into context.",
@@ -39,6 +93,21 @@ class GDScriptTools:
                     "required": ["file_path"],
                 },
             ),
+            Tool(
+                name="analyze_gdscript_files",
+                description="Analyze several GDScript files in one call, in parallel. Returns the same per-file result as analyze_gdscript_file, or an error message for files that could not be analyzed.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "file_paths": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Paths to the GDScript files to analyze",
+                        }
+                    },
+                    "required": ["file_paths"],
+                },
+            ),
             Tool(
                 name="get_gdscript_structure",
                 description="Get a high-level structure view of a GDScript file, showing all classes, functions, signals, and variables with their line numbers.",
@@ -141,6 +210,7 @@ class GDScriptTools:
                 },
             ),
         ]
+        return self._tools_cache
 
     def handle_tool_call(self, tool_name: str, tool_input: dict[str, Any]) -> CallToolResult:
         """Handle a tool call.
@@ -155,6 +225,8 @@ class GDScriptTools:
         try:
             if tool_name == "analyze_gdscript_file":
                 return self._analyze_file(tool_input["file_path"])
+            elif tool_name == "analyze_gdscript_files":
+                return self._analyze_files(tool_input["file_paths"])
             elif tool_name == "get_gdscript_structure":
                 return self._get_structure(tool_input["file_path"])
             elif tool_name == "find_gdscript_symbol":
@@ -189,46 +261,96 @@ class GDScriptTools:
         Returns:
             CallToolResult with analysis
         """
-        try:
-            path = Path(file_path)
-            if not path.exists():
-                return CallToolResult(
-                    content=[TextContent(type="text", text=f"File not found: {file_path}")],
-                    isError=True,
-                )
+        result = self._analyze_one(file_path)
+        if "error" in result:
+            return CallToolResult(
+                content=[TextContent(type="text", text=result["error"])],
+                isError=True,
+            )
 
-            if not path.suffix.lower() in [".gd", ".gdscript"]:
-                return CallToolResult(
-                    content=[TextContent(type="text", text="File must be a .gd or .gdscript file")],
-                    isError=True,
-                )
+        return CallToolResult(
+            content=[TextContent(type="text", text=_dumps(result))],
+            isError=False,
+        )
+
+    def _analyze_files(self, file_paths: list[str]) -> CallToolResult:
+        """Analyze several GDScript files in parallel.
+
+        Args:
+            file_paths: Paths to the files
 
-            code = path.read_text(encoding="utf-8")
-            tree = self.parser.parse(code)
-            symbols = self.parser.get_symbols(tree)
+        Returns:
+            CallToolResult with one analysis (or error) per file, in input order
+        """
+        try:
+            workers = max(1, min(len(file_paths), os.cpu_count() or 1))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                files = list(executor.map(self._analyze_one, file_paths))
 
             result = {
-                "file": file_path,
-                "symbols": symbols,
-                "summary": {
-                    "total_classes": len(symbols["classes"]),
-                    "total_functions": len(symbols["functions"]),
-                    "total_signals": len(symbols["signals"]),
-                    "total_variables": len(symbols["variables"]),
-                    "total_enums": len(symbols["enums"]),
-                },
+                "files": files,
+                "total_files": len(files),
+                "total_errors": sum(1 for f in files if "error" in f),
             }
 
             return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, indent=2))],
+                content=[TextContent(type="text", text=_dumps(result))],
                 isError=False,
             )
         except Exception as e:
             return CallToolResult(
-                content=[TextContent(type="text", text=f"Error analyzing file: {str(e)}")],
+                content=[TextContent(type="text", text=f"Error analyzing files: {str(e)}")],
                 isError=True,
             )
 
+    def _analyze_one(self, file_path: str) -> dict[str, Any]:
+        """Analyze a GDScript file into a JSON-serializable result.
+
+        Safe to call from several threads at once.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Dictionary with "file", "symbols" and "summary", or with "file" and
+            "error" if the file could not be analyzed
+        """
+        try:
+            path = Path(file_path)
+            if not path.exists():
+                return {"file": file_path, "error": f"File not found: {file_path}"}
+
+            if path.suffix.lower() not in _GD_SUFFIXES:
+                return {"file": file_path, "error": "File must be a .gd or .gdscript file"}
+
+            symbols = self._load_analysis(path)["symbols"]
+
+            return {
+                "file": file_path,
+                "symbols": self.parser.symbols_as_dicts(symbols),
+                "summary": self._summarize(symbols),
+            }
+        except Exception as e:
+            return {"file": file_path, "error": f"Error analyzing file: {str(e)}"}
+
+    def _summarize(self, symbols: dict[str, Any]) -> dict[str, int]:
+        """Count the symbols of each type.
+
+        Args:
+            symbols: Symbol dictionary as returned by GDScriptParser.get_symbols
+                or the "symbols" entry of GDScriptParser.extract_all
+
+        Returns:
+            Dictionary with the total count per symbol type
+        """
+        return {
+            "total_classes": len(symbols["classes"]),
+            "total_functions": len(symbols["functions"]),
+            "total_signals": len(symbols["signals"]),
+            "total_variables": len(symbols["variables"]),
+            "total_enums": len(symbols["enums"]),
+        }
+
     def _get_structure(self, file_path: str) -> CallToolResult:
         """Get structure view of a GDScript file.
 
@@ -246,9 +368,7 @@ class GDScriptTools:
                     isError=True,
                 )
 
-            code = path.read_text(encoding="utf-8")
-            tree = self.parser.parse(code)
-            structure = self.parser.get_structure(tree, code)
+            structure = self._load_analysis(path)["structure"]
 
             return CallToolResult(
                 content=[TextContent(type="text", text=structure)],
@@ -278,13 +398,12 @@ class GDScriptTools:
                     isError=True,
                 )
 
-            code = path.read_text(encoding="utf-8")
-            tree = self.parser.parse(code)
-            symbol = self.parser.find_symbol(tree, symbol_name)
+            entry = self._load_analysis(path)["by_name"].get(symbol_name)
 
-            if symbol:
+            if entry:
+                symbol = self.parser.symbol_info(entry)
                 return CallToolResult(
-                    content=[TextContent(type="text", text=json.dumps(symbol, indent=2))],
+                    content=[TextContent(type="text", text=_dumps(symbol))],
                     isError=False,
                 )
             else:
@@ -315,9 +434,7 @@ class GDScriptTools:
                     isError=True,
                 )
 
-            code = path.read_text(encoding="utf-8")
-            tree = self.parser.parse(code)
-            dependencies = self.parser.get_dependencies(tree, code)
+            dependencies = self._load_analysis(path)["dependencies"]
 
             result = {
                 "file": file_path,
@@ -325,7 +442,7 @@ class GDScriptTools:
             }
 
             return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, indent=2))],
+                content=[TextContent(type="text", text=_dumps(result))],
                 isError=False,
             )
         except Exception as e:
@@ -334,6 +451,102 @@ class GDScriptTools:
                 isError=True,
             )
 
+    def _source_key(self, path: Path) -> tuple[str, int, int]:
+        """Get the in-memory cache key of a file.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            Tuple of (resolved path, st_mtime_ns, st_size)
+        """
+        path = path.resolve()
+        stat = os.stat(path)
+        return str(path), stat.st_mtime_ns, stat.st_size
+
+    def _hash_source_uncached(self, path_str: str, mtime_ns: int, size: int) -> bytes:
+        """Hash the contents of a file.
+
+        The file is memory-mapped and hashed in place, so a persistent cache hit
+        never copies the file contents into a Python object. The mtime and size
+        arguments are unused here but form part of the cache key.
+
+        Args:
+            path_str: Resolved path to the file
+            mtime_ns: Modification time of the file in nanoseconds
+            size: Size of the file in bytes
+
+        Returns:
+            SHA-256 digest of the file contents
+        """
+        with open(path_str, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files cannot be memory-mapped
+                return hashlib.sha256(b"").digest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).digest()
+
+    def _load_and_parse_uncached(
+        self, path_str: str, mtime_ns: int, size: int
+    ) -> tuple[Tree, bytes]:
+        """Read and parse a file.
+
+        If the same file was the last one parsed, the new contents are parsed
+        incrementally from the previous tree.
+
+        Args:
+            path_str: Resolved path to the file
+            mtime_ns: Modification time of the file in nanoseconds
+            size: Size of the file in bytes
+
+        Returns:
+            Tuple of (syntax tree, UTF-8 encoded source code)
+        """
+        code_bytes = Path(path_str).read_bytes()
+
+        last = self._last_parse
+        if last is not None and last[0] == path_str:
+            tree = self.parser.reparse(last[2], last[1], code_bytes)
+        else:
+            tree = self.parser.parse_bytes(code_bytes)
+
+        self._last_parse = (path_str, code_bytes, tree)
+        return tree, code_bytes
+
+    def _load_tree(self, path: Path) -> tuple[Tree, bytes]:
+        """Get the syntax tree and source code of a file, reusing recent parses.
+
+        Args:
+            path: Path to the GDScript file
+
+        Returns:
+            Tuple of (syntax tree, UTF-8 encoded source code)
+        """
+        return self._load_and_parse(*self._source_key(path))
+
+    def _load_analysis(self, path: Path) -> dict[str, Any]:
+        """Get symbols, dependencies and structure of a file, using the caches when possible.
+
+        Args:
+            path: Path to the GDScript file
+
+        Returns:
+            Dictionary with "symbols", "dependencies", "by_name" and "structure"
+        """
+        key = self._source_key(path)
+        digest = self._hash_source(*key)
+
+        analysis = self._cache.get(key[0], digest)
+        if analysis is None:
+            tree, code = self._load_and_parse(*key)
+            analysis = self.parser.extract_all(tree, code)
+            analysis["structure"] = self.parser.format_structure(analysis["symbols"])
+            # Store under the hash of the bytes actually parsed: the file may have
+            # been saved again between hashing it and reading it for the parse
+            self._cache.put(key[0], hashlib.sha256(code).digest(), analysis)
+
+        return analysis
+
     def _analyze_code(self, code: str) -> CallToolResult:
         """Analyze GDScript code provided directly.
 
@@ -344,24 +557,19 @@ class GDScriptTools:
             CallToolResult with analysis
         """
         try:
-            tree = self.parser.parse(code)
-            symbols = self.parser.get_symbols(tree)
-            structure = self.parser.get_structure(tree, code)
+            code_bytes = code.encode("utf-8")
+            tree = self.parser.parse_bytes(code_bytes)
+            symbols = self.parser.extract_all(tree, code_bytes)["symbols"]
+            structure = self.parser.format_structure(symbols)
 
             result = {
                 "structure": structure,
-                "symbols": symbols,
-                "summary": {
-                    "total_classes": len(symbols["classes"]),
-                    "total_functions": len(symbols["functions"]),
-                    "total_signals": len(symbols["signals"]),
-                    "total_variables": len(symbols["variables"]),
-                    "total_enums": len(symbols["enums"]),
-                },
+                "symbols": self.parser.symbols_as_dicts(symbols),
+                "summary": self._summarize(symbols),
             }
 
             return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, indent=2))],
+                content=[TextContent(type="text", text=_dumps(result))],
                 isError=False,
             )
         except Exception as e:
@@ -370,15 +578,31 @@ class GDScriptTools:
                 isError=True,
             )
 
-    def _load_gdscript_files(self) -> None:
-        """Load all .gd files from the project root."""
-        if not self.project_root:
-            self._gdscript_files = []
-            return
+    def _load_gdscript_files(self, root: Optional[Path] = None) -> None:
+        """Load all .gd files from a project root and make it the current root.
+
+        The file list is built first and then published together with its root,
+        so concurrent tool calls never see a partial list or another root's files.
 
-        self._gdscript_files = []
-        for file_path in self.project_root.rglob("*.gd"):
-            self._gdscript_files.append(file_path)
+        Args:
+            root: Project root to scan. Defaults to the current project root
+        """
+        if root is None:
+            root = self.project_root
+        files = list(root.rglob("*.gd")) if root else []
+
+        with self._project_lock:
+            self.project_root = root
+            self._gdscript_files = files
+
+    def _project_snapshot(self) -> tuple[Optional[Path], list[Path]]:
+        """Get the current project root and its GDScript files as a consistent pair.
+
+        Returns:
+            Tuple of (project root, list of .gd files under it)
+        """
+        with self._project_lock:
+            return self.project_root, self._gdscript_files
 
     def _set_project_root(self, project_root: str) -> CallToolResult:
         """Set the project root directory.
@@ -403,17 +627,17 @@ class GDScriptTools:
                     isError=True,
                 )
 
-            self.project_root = root_path
-            self._load_gdscript_files()
+            self._load_gdscript_files(root_path)
+            project_root, gdscript_files = self._project_snapshot()
 
             result = {
-                "project_root": str(self.project_root),
-                "gdscript_files_count": len(self._gdscript_files),
+                "project_root": str(project_root),
+                "gdscript_files_count": len(gdscript_files),
                 "status": "success",
             }
 
             return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, indent=2))],
+                content=[TextContent(type="text", text=_dumps(result))],
                 isError=False,
             )
         except Exception as e:
@@ -429,19 +653,20 @@ class GDScriptTools:
             CallToolResult with project root info
         """
         try:
-            if not self.project_root:
+            project_root, gdscript_files = self._project_snapshot()
+            if not project_root:
                 return CallToolResult(
                     content=[TextContent(type="text", text="No project root set")],
                     isError=False,
                 )
 
             result = {
-                "project_root": str(self.project_root),
-                "gdscript_files_count": len(self._gdscript_files),
+                "project_root": str(project_root),
+                "gdscript_files_count": len(gdscript_files),
             }
 
             return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, indent=2))],
+                content=[TextContent(type="text", text=_dumps(result))],
                 isError=False,
             )
         except Exception as e:
@@ -461,6 +686,7 @@ class GDScriptTools:
             CallToolResult with references
         """
         try:
+            project_root, gdscript_files = self._project_snapshot()
             files_to_search: list[Path] = []
 
             if file_path:
@@ -472,9 +698,9 @@ class GDScriptTools:
                         isError=True,
                     )
                 files_to_search = [path]
-            elif self.project_root:
+            elif project_root:
                 # Search in project
-                files_to_search = self._gdscript_files
+                files_to_search = gdscript_files
             else:
                 return CallToolResult(
                     content=[TextContent(type="text", text="No project root set and no specific file provided")],
@@ -485,13 +711,12 @@ class GDScriptTools:
 
             for file in files_to_search:
                 try:
-                    code = file.read_text(encoding="utf-8")
-                    tree = self.parser.parse(code)
-                    references = self.parser.find_references(tree, symbol_name)
+                    tree, code = self._load_tree(file)
+                    references = self.parser.find_references(tree, symbol_name, code)
 
                     for ref in references:
                         all_references.append({
-                            "file": str(file.relative_to(self.project_root) if self.project_root else file),
+                            "file": str(file.relative_to(project_root) if project_root else file),
                             "line": ref["line"],
                             "column": ref["column"],
                             "end_line": ref["end_line"],
@@ -508,7 +733,7 @@ class GDScriptTools:
             }
 
             return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, indent=2))],
+                content=[TextContent(type="text", text=_dumps(result))],
                 isError=False,
             )
         except Exception as e:
@@ -0,0 +1,134 @@
+"""Tests for AnalysisCache."""
+
+import hashlib
+import json
+import pytest
+import sqlite3
+
+from mcp_gdscript.cache import AnalysisCache, default_cache_path
+from mcp_gdscript.tools import GDScriptTools
+
+
+@pytest.fixture
+def analysis():
+	"""Sample analysis result."""
+	return {
+		"symbols": {
+			"classes": [],
+			"functions": [{"name": "_ready", "line": 3, "column": 0}],
+			"variables": [],
+			"signals": [],
+			"enums": [],
+		},
+		"dependencies": {"extends": ["Node"], "preload": [], "import": []},
+		"by_name": {"_ready": {"type": "function", "name": "_ready", "line": 3, "column": 0}},
+		"structure": "=== GDScript File Structure ===\n",
+	}
+
+
+def test_get_miss(tmp_path):
+	"""Test looking up a file that was never stored."""
+	cache = AnalysisCache(tmp_path / "cache.sqlite3")
+	assert cache.get("/some/file.gd", b"digest") is None
+
+
+def test_put_and_get(tmp_path, analysis):
+	"""Test that stored analysis is returned for a matching hash."""
+	cache = AnalysisCache(tmp_path / "cache.sqlite3")
+	cache.put("/some/file.gd", b"digest", analysis)
+	assert cache.get("/some/file.gd", b"digest") == analysis
+
+
+def test_hash_mismatch_is_miss(tmp_path, analysis):
+	"""Test that a changed content hash invalidates the entry."""
+	cache = AnalysisCache(tmp_path / "cache.sqlite3")
+	cache.put("/some/file.gd", b"old", analysis)
+	assert cache.get("/some/file.gd", b"new") is None
+
+
+def test_persists_across_instances(tmp_path, analysis):
+	"""Test that entries survive reopening the database."""
+	db_path = tmp_path / "nested" / "cache.sqlite3"
+	cache = AnalysisCache(db_path)
+	cache.put("/some/file.gd", b"digest", analysis)
+	cache.close()
+
+	assert AnalysisCache(db_path).get("/some/file.gd", b"digest") == analysis
+
+
+def test_incompatible_pickle_is_miss(tmp_path, analysis):
+	"""Test that an entry that cannot be unpickled is treated as a miss."""
+	db_path = tmp_path / "cache.sqlite3"
+	cache = AnalysisCache(db_path)
+	cache.put("/some/file.gd", b"digest", analysis)
+	cache.close()
+
+	conn = sqlite3.connect(str(db_path))
+	conn.execute("UPDATE analysis SET symbols = ?", (b"cmcp_gdscript.parser\nNoSuchSymbol\n.",))
+	conn.commit()
+	conn.close()
+
+	assert AnalysisCache(db_path).get("/some/file.gd", b"digest") is None
+
+
+def test_unusable_path_disables_cache(tmp_path, analysis):
+	"""Test that an unopenable database degrades to a no-op cache."""
+	blocker = tmp_path / "file"
+	blocker.write_text("not a directory")
+	cache = AnalysisCache(blocker / "cache.sqlite3")
+	cache.put("/some/file.gd", b"digest", analysis)
+	assert cache.get("/some/file.gd", b"digest") is None
+
+
+def test_default_cache_path_honors_xdg(monkeypatch, tmp_path):
+	"""Test that XDG_CACHE_HOME selects the cache location."""
+	monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+	assert default_cache_path().parent == tmp_path / "mcp-gdscript"
+
+
+def test_tools_serve_cached_analysis(tmp_path, monkeypatch):
+	"""Test that tools reuse and invalidate cached analysis by content hash."""
+	script = tmp_path / "script.gd"
+	script.write_text("func first() -> void:\n\tpass\n")
+	cache_path = tmp_path / "cache.sqlite3"
+
+	result = GDScriptTools(cache_path=cache_path)._analyze_file(str(script))
+	assert not result.isError
+
+	digest = hashlib.sha256(script.read_bytes()).digest()
+	cached = AnalysisCache(cache_path).get(str(script.resolve()), digest)
+	assert cached is not None
+	assert cached["symbols"]["functions"][0].name == "first"
+
+	def fail_parse(*args, **kwargs):
+		raise AssertionError("cached analysis should not be reparsed")
+
+	tools = GDScriptTools(cache_path=cache_path)
+	monkeypatch.setattr(tools.parser, "parse_bytes", fail_parse)
+	result = tools._analyze_file(str(script))
+	assert not result.isError
+	assert json.loads(result.content[0].text)["symbols"]["functions"][0]["name"] == "first"
+
+	script.write_text("func second() -> void:\n\tpass\n")
+	result = GDScriptTools(cache_path=cache_path)._analyze_file(str(script))
+	content = json.loads(result.content[0].text)
+	assert [f["name"] for f in content["symbols"]["functions"]] == ["second"]
+
+
+def test_tools_store_digest_of_parsed_bytes(tmp_path):
+	"""Test that a file saved between hashing and parsing is stored under the parsed hash."""
+	script = tmp_path / "script.gd"
+	old_code = b"func first() -> void:\n\tpass\n"
+	script.write_bytes(b"func second() -> void:\n\tpass\n")
+	cache_path = tmp_path / "cache.sqlite3"
+
+	tools = GDScriptTools(cache_path=cache_path)
+	# Simulate the hash having been taken before the file was saved
+	tools._hash_source = lambda *key: hashlib.sha256(old_code).digest()
+	tools._analyze_file(str(script))
+
+	cache = AnalysisCache(cache_path)
+	file_key = str(script.resolve())
+	assert cache.get(file_key, hashlib.sha256(old_code).digest()) is None
+	cached = cache.get(file_key, hashlib.sha256(script.read_bytes()).digest())
+	assert cached["symbols"]["functions"][0].name == "second"
@@ -1,9 +1,10 @@
 """Tests for GDScriptParser."""
 
 import pytest
+import threading
 from pathlib import Path
 
-from mcp_gdscript.parser import GDScriptParser
+from mcp_gdscript.parser import GDScriptParser, get_thread_parser
 
 
 @pytest.fixture
@@ -88,6 +89,34 @@ def test_find_symbol(parser, sample_code):
 	assert nonexistent is None
 
 
+def test_find_symbol_prefers_type_order(parser):
+	"""Test that a name defined twice resolves by symbol type priority."""
+	code = """
+var shadow = 1
+
+class shadow:
+	pass
+"""
+	tree = parser.parse(code)
+	symbol = parser.find_symbol(tree, "shadow")
+	assert symbol["line"] == 4
+
+	by_name = parser.extract_all(tree)["by_name"]
+	assert set(by_name) == {"shadow"}
+	assert parser.symbol_info(by_name["shadow"]) == symbol
+
+
+def test_find_symbol_matches_index(parser, fixture_dir):
+	"""Test that find_symbol agrees with the extracted symbol index."""
+	for gd_file in sorted(fixture_dir.glob("*.gd")):
+		tree = parser.parse_bytes(gd_file.read_bytes())
+		by_name = parser.extract_all(tree)["by_name"]
+
+		for name, entry in by_name.items():
+			assert parser.find_symbol(tree, name) == parser.symbol_info(entry)
+		assert parser.find_symbol(tree, "nonexistent") is None
+
+
 def test_find_references_in_tree(parser, sample_code):
 	"""Test finding symbol references."""
 	tree = parser.parse(sample_code)
@@ -119,6 +148,65 @@ preload("res://scenes/enemy.tscn")
 	assert len(deps["preload"]) == 2
 
 
+def test_extract_all(parser, sample_code):
+	"""Test extracting symbols and dependencies in one pass."""
+	tree = parser.parse(sample_code)
+	result = parser.extract_all(tree)
+
+	assert parser.symbols_as_dicts(result["symbols"]) == parser.get_symbols(tree)
+	assert result["dependencies"] == parser.get_dependencies(tree, sample_code)
+	assert result["dependencies"]["extends"] == ["Node2D"]
+
+
+def test_get_symbols_deeply_nested(parser):
+	"""Test that symbols are found regardless of nesting depth."""
+	code = "".join("\t" * i + f"class Level{i}:\n" for i in range(15))
+	code += "\t" * 15 + "func deepest() -> void:\n" + "\t" * 16 + "pass\n"
+	tree = parser.parse(code)
+	symbols = parser.get_symbols(tree)
+
+	assert len(symbols["classes"]) == 15
+	assert [f["name"] for f in symbols["functions"]] == ["deepest"]
+
+
+def test_deep_expression_beyond_recursion_limit(parser):
+	"""Test that trees deeper than Python's recursion limit are fully traversed."""
+	code = "var speed = 1\nfunc f():\n\treturn " + "(" * 1500 + "speed" + ")" * 1500 + "\n"
+	tree = parser.parse(code)
+
+	assert parser.find_symbol(tree, "speed")["line"] == 1
+	assert [r["line"] for r in parser.find_references(tree, "speed", code)] == [1, 3]
+
+
+def test_get_dependencies_nested_and_paths(parser):
+	"""Test dependency extraction from path extends and nested preloads."""
+	code = """
+extends "res://base.gd"
+
+class Inner extends Node:
+	func load_scene():
+		return preload('res://scenes/inner.tscn')
+"""
+	tree = parser.parse(code)
+	deps = parser.get_dependencies(tree, code)
+
+	assert deps["extends"] == ["res://base.gd", "Node"]
+	assert deps["preload"] == ["res://scenes/inner.tscn"]
+
+
+def test_get_dependencies_string_delimiters(parser):
+	"""Test that quotes and string prefixes are stripped from preload paths."""
+	code = """
+var a = preload(\"\"\"res://triple.gd\"\"\")
+var b = preload(r"res://raw.gd")
+var c = preload("")
+"""
+	tree = parser.parse(code)
+	deps = parser.get_dependencies(tree, code)
+
+	assert deps["preload"] == ["res://triple.gd", "res://raw.gd"]
+
+
 def test_get_structure(parser, sample_code):
 	"""Test structure generation."""
 	tree = parser.parse(sample_code)
@@ -129,6 +217,13 @@ def test_get_structure(parser, sample_code):
 	assert "Variables" in structure or "variables" in structure.lower()
 
 
+def test_format_structure_matches_get_structure(parser, sample_code):
+	"""Test formatting precomputed symbols gives the same structure."""
+	tree = parser.parse(sample_code)
+	symbols = parser.extract_all(tree, sample_code)["symbols"]
+	assert parser.format_structure(symbols) == parser.get_structure(tree, sample_code)
+
+
 def test_parse_from_file(parser, fixture_dir):
 	"""Test parsing from a file."""
 	player_file = fixture_dir / "sample_player.gd"
@@ -156,6 +251,82 @@ def test_find_references_in_file(parser, fixture_dir):
 		assert len(references) > 0
 
 
+def test_parsers_share_compiled_query():
+	"""Test that parser instances reuse the module-level query."""
+	assert GDScriptParser().extract_query is GDScriptParser().extract_query
+
+
+def test_thread_parser_is_per_thread():
+	"""Test that each thread gets its own tree-sitter parser."""
+	assert get_thread_parser() is get_thread_parser()
+
+	other = []
+	thread = threading.Thread(target=lambda: other.append(get_thread_parser()))
+	thread.start()
+	thread.join()
+	assert other[0] is not get_thread_parser()
+
+
+def test_parse_bytes(parser, sample_code):
+	"""Test that str and UTF-8 bytes input parse identically."""
+	from_str = parser.get_symbols(parser.parse(sample_code))
+	from_bytes = parser.get_symbols(parser.parse_bytes(sample_code.encode("utf-8")))
+	assert from_str == from_bytes
+
+
+def test_symbols_with_and_without_source(parser):
+	"""Test that node text sliced from the source matches with or without passing it."""
+	code = "\n\n# コメント\nvar greeting = \"héllo\"\nfunc greet() -> void:\n\tprint(greeting)\n"
+	tree = parser.parse(code)
+
+	symbols = parser.get_symbols(tree, code)
+	assert symbols == parser.get_symbols(tree)
+	assert [v["name"] for v in symbols["variables"]] == ["greeting"]
+	assert [f["name"] for f in symbols["functions"]] == ["greet"]
+	assert len(parser.find_references(tree, "greeting", code)) == 2
+	without_source = parser.find_references(tree, "greeting")
+	assert without_source == parser.find_references(tree, "greeting", code)
+
+
+def test_find_references_document_order(parser):
+	"""Test that references are reported in document order with their spans."""
+	code = """
+var hp = 10
+
+func heal(amount: int) -> void:
+	hp = min(hp + amount, 100)
+"""
+	tree = parser.parse(code)
+	references = parser.find_references(tree, "hp", code)
+
+	assert [(r["line"], r["column"]) for r in references] == [(2, 4), (5, 1), (5, 10)]
+	assert all(r["end_column"] - r["column"] == 2 for r in references)
+
+
+@pytest.mark.parametrize(
+	"old_code,new_code",
+	[
+		("var a = 1\n", "var a = 1\nvar b = 2\n"),
+		("var a = 1\nvar b = 2\n", "var b = 2\n"),
+		("func f():\n\tpass\n", "func renamed():\n\tpass\n"),
+		("var a = 1\n", "var a = 1\n"),
+		("", "signal s\n"),
+		("var aaa = 1\n", "var aa = 1\n"),
+	],
+)
+def test_reparse_matches_fresh_parse(parser, old_code, new_code):
+	"""Test that incremental reparsing yields the same tree as parsing from scratch."""
+	old_bytes, new_bytes = old_code.encode("utf-8"), new_code.encode("utf-8")
+	old_tree = parser.parse_bytes(old_bytes)
+	old_sexp = str(old_tree.root_node)
+
+	tree = parser.reparse(old_tree, old_bytes, new_bytes)
+
+	assert str(tree.root_node) == str(parser.parse_bytes(new_bytes).root_node)
+	assert parser.get_symbols(tree, new_bytes) == parser.get_symbols(parser.parse(new_code))
+	assert str(old_tree.root_node) == old_sexp
+
+
 def test_empty_code(parser):
 	"""Test parsing empty code."""
 	tree = parser.parse("")
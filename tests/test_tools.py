@@ -2,75 +2,179 @@
 
 import json
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from tempfile import TemporaryDirectory
 
 from mcp_gdscript.tools import GDScriptTools
 
+_FIXTURE_DIR = Path(__file__).parent / "fixtures"
+_PLAYER = _FIXTURE_DIR / "sample_player.gd"
+_HAS_PLAYER = _PLAYER.is_file()
 
-@pytest.fixture
+_SAMPLE_CODE = """
+extends Node2D
+
+signal my_signal
+
+var my_var: int = 10
+
+func my_func() -> void:
+	print("test")
+	my_var = 20
+"""
+
+needs_player = pytest.mark.skipif(not _HAS_PLAYER, reason="sample_player.gd missing")
+
+
+def _payload(result):
+	"""Decode the JSON text of a tool result, caching it on the result."""
+	payload = getattr(result, "_payload", None)
+	if payload is None:
+		payload = json.loads(result.content[0].text)
+		result._payload = payload
+	return payload
+
+
+SCHEMAS = [
+	pytest.param(
+		"analyze_gdscript_file",
+		{"file_path": str(_PLAYER)},
+		{"file", "symbols", "summary"},
+		marks=needs_player,
+	),
+	pytest.param(
+		"analyze_gdscript_code",
+		{"code": _SAMPLE_CODE},
+		{"structure", "symbols", "summary"},
+	),
+	pytest.param(
+		"get_gdscript_dependencies",
+		{"file_path": str(_PLAYER)},
+		{"file", "dependencies"},
+		marks=needs_player,
+	),
+	pytest.param(
+		"set_project_root",
+		{"project_root": str(_FIXTURE_DIR)},
+		{"project_root", "gdscript_files_count", "status"},
+	),
+	pytest.param(
+		"get_project_root",
+		{},
+		{"project_root", "gdscript_files_count"},
+	),
+	pytest.param(
+		"find_references",
+		{"symbol_name": "player_name", "file_path": str(_PLAYER)},
+		{"symbol", "total_references", "references"},
+		marks=needs_player,
+	),
+	pytest.param(
+		"find_references",
+		{"symbol_name": "player_name"},
+		{"symbol", "total_references", "references"},
+	),
+]
+
+
+@pytest.fixture(scope="session")
 def tools():
-	"""Create a GDScriptTools instance."""
-	return GDScriptTools()
+	"""Create a GDScriptTools instance shared by tests that don't set a project root."""
+	return GDScriptTools(cache_path=":memory:")
 
 
 @pytest.fixture
+def fresh_tools():
+	"""Create a GDScriptTools instance for tests that change the project root."""
+	return GDScriptTools(cache_path=":memory:")
+
+
+@pytest.fixture(scope="session")
 def fixture_dir():
 	"""Get the fixtures directory."""
-	return Path(__file__).parent / "fixtures"
+	return _FIXTURE_DIR
 
 
-@pytest.fixture
-def sample_code():
-	"""Sample GDScript code."""
-	return """
-extends Node2D
+@pytest.fixture(scope="session")
+def project_tools(fixture_dir):
+	"""Create a GDScriptTools instance with the fixtures directory as project root."""
+	project_tools = GDScriptTools(cache_path=":memory:")
+	project_tools._set_project_root(str(fixture_dir))
+	return project_tools
 
-signal my_signal
 
-var my_var: int = 10
+@pytest.fixture(scope="session")
+def parsed_player(tools):
+	"""Parse sample_player.gd once into the shared tools' parse cache."""
+	return tools._load_tree(_PLAYER)
 
-func my_func() -> void:
-	print("test")
-	my_var = 20
-"""
 
+@pytest.fixture(scope="session")
+def non_gd_file(tmp_path_factory):
+	"""Create a non-GDScript text file."""
+	path = tmp_path_factory.mktemp("nongd") / "test.txt"
+	path.write_text("random text")
+	return path
 
-class TestAnalyzeFile:
-	def test_analyze_existing_file(self, tools, fixture_dir):
-		"""Test analyzing an existing file."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools._analyze_file(str(player_file))
-			assert not result.isError
-			content = json.loads(result.content[0].text)
-			assert "file" in content
-			assert "symbols" in content
-			assert "summary" in content
 
+@pytest.fixture(scope="session")
+def tool_name_set(tools):
+	"""Get the names of all registered tools."""
+	return frozenset(tool.name for tool in tools.get_tools())
+
+
+class TestAnalyzeFile:
 	def test_analyze_nonexistent_file(self, tools):
 		"""Test analyzing a non-existent file."""
 		result = tools._analyze_file("/nonexistent/file.gd")
 		assert result.isError
 		assert "not found" in result.content[0].text.lower()
 
-	def test_analyze_non_gdscript_file(self, tools, tmp_path):
+	def test_analyze_non_gdscript_file(self, tools, non_gd_file):
 		"""Test analyzing a non-GDScript file."""
-		txt_file = tmp_path / "test.txt"
-		txt_file.write_text("random text")
-		result = tools._analyze_file(str(txt_file))
+		result = tools._analyze_file(str(non_gd_file))
 		assert result.isError
 
 
+class TestAnalyzeFiles:
+	def test_analyze_files(self, tools, fixture_dir):
+		"""Test analyzing several files in one call."""
+		files = sorted(str(f) for f in fixture_dir.glob("*.gd"))
+		result = tools._analyze_files(files)
+		assert not result.isError
+		content = _payload(result)
+		assert content["total_files"] == len(files)
+		assert content["total_errors"] == 0
+		assert [f["file"] for f in content["files"]] == files
+		for file_result, file_path in zip(content["files"], files):
+			single = _payload(tools._analyze_file(file_path))
+			assert file_result == single
+
+	@needs_player
+	def test_analyze_files_reports_errors_per_file(self, tools):
+		"""Test that a bad path does not fail the whole batch."""
+		result = tools._analyze_files([str(_PLAYER), "/nonexistent/file.gd"])
+		assert not result.isError
+		content = _payload(result)
+		assert content["total_errors"] == 1
+		assert "symbols" in content["files"][0]
+		assert "not found" in content["files"][1]["error"].lower()
+
+	def test_analyze_files_empty(self, tools):
+		"""Test analyzing an empty list of files."""
+		result = tools._analyze_files([])
+		assert not result.isError
+		assert _payload(result)["total_files"] == 0
+
+
 class TestGetStructure:
-	def test_get_structure(self, tools, fixture_dir):
+	@needs_player
+	def test_get_structure(self, tools):
 		"""Test getting file structure."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools._get_structure(str(player_file))
-			assert not result.isError
-			content = result.content[0].text
-			assert "GDScript File Structure" in content or "Structure" in content
+		result = tools._get_structure(str(_PLAYER))
+		assert not result.isError
+		content = result.content[0].text
+		assert "GDScript File Structure" in content or "Structure" in content
 
 	def test_get_structure_nonexistent_file(self, tools):
 		"""Test getting structure of non-existent file."""
@@ -79,67 +183,46 @@ class TestGetStructure:
 
 
 class TestFindSymbol:
-	def test_find_existing_symbol(self, tools, fixture_dir):
+	@needs_player
+	def test_find_existing_symbol(self, tools):
 		"""Test finding an existing symbol."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools._find_symbol(str(player_file), "_ready")
-			if not result.isError:
-				content = json.loads(result.content[0].text)
-				assert content["name"] == "_ready"
-
-	def test_find_nonexistent_symbol(self, tools, fixture_dir):
+		result = tools._find_symbol(str(_PLAYER), "_ready")
+		assert not result.isError
+		assert _payload(result)["name"] == "_ready"
+
+	@needs_player
+	def test_find_nonexistent_symbol(self, tools):
 		"""Test finding a non-existent symbol."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools._find_symbol(str(player_file), "nonexistent_symbol")
-			assert result.isError
+		result = tools._find_symbol(str(_PLAYER), "nonexistent_symbol")
+		assert result.isError
 
 
 class TestGetDependencies:
-	def test_get_dependencies(self, tools, fixture_dir):
+	@needs_player
+	def test_get_dependencies(self, tools):
 		"""Test extracting dependencies."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools._get_dependencies(str(player_file))
-			assert not result.isError
-			content = json.loads(result.content[0].text)
-			assert "dependencies" in content
-			assert "extends" in content["dependencies"]
-
-
-class TestAnalyzeCode:
-	def test_analyze_code(self, tools, sample_code):
-		"""Test analyzing code directly."""
-		result = tools._analyze_code(sample_code)
+		result = tools._get_dependencies(str(_PLAYER))
 		assert not result.isError
-		content = json.loads(result.content[0].text)
-		assert "structure" in content
-		assert "symbols" in content
-		assert "summary" in content
+		assert "extends" in _payload(result)["dependencies"]
 
 
 class TestSetProjectRoot:
-	def test_set_valid_project_root(self, tools, fixture_dir):
+	def test_set_valid_project_root(self, fresh_tools, fixture_dir):
 		"""Test setting a valid project root."""
-		result = tools._set_project_root(str(fixture_dir))
+		result = fresh_tools._set_project_root(str(fixture_dir))
 		assert not result.isError
-		content = json.loads(result.content[0].text)
-		assert "project_root" in content
-		assert "gdscript_files_count" in content
-		assert content["status"] == "success"
+		assert _payload(result)["status"] == "success"
 
 	def test_set_nonexistent_project_root(self, tools):
 		"""Test setting a non-existent project root."""
 		result = tools._set_project_root("/nonexistent/path")
 		assert result.isError
 
-	def test_set_file_as_project_root(self, tools, fixture_dir):
+	@needs_player
+	def test_set_file_as_project_root(self, tools):
 		"""Test setting a file instead of directory as project root."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools._set_project_root(str(player_file))
-			assert result.isError
+		result = tools._set_project_root(str(_PLAYER))
+		assert result.isError
 
 
 class TestGetProjectRoot:
@@ -149,15 +232,6 @@ class TestGetProjectRoot:
 		assert not result.isError
 		assert "No project root" in result.content[0].text
 
-	def test_get_project_root_after_set(self, tools, fixture_dir):
-		"""Test getting project root after setting."""
-		tools._set_project_root(str(fixture_dir))
-		result = tools._get_project_root()
-		assert not result.isError
-		content = json.loads(result.content[0].text)
-		assert "project_root" in content
-		assert "gdscript_files_count" in content
-
 
 class TestFindReferences:
 	def test_find_references_without_project_root_or_file(self, tools):
@@ -166,84 +240,74 @@ class TestFindReferences:
 		assert result.isError
 		assert "project root" in result.content[0].text.lower() or "file" in result.content[0].text.lower()
 
-	def test_find_references_in_file(self, tools, fixture_dir):
+	@needs_player
+	def test_find_references_in_file(self, tools):
 		"""Test finding references in a specific file."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools._find_references("player_name", str(player_file))
-			assert not result.isError
-			content = json.loads(result.content[0].text)
-			assert "symbol" in content
-			assert "total_references" in content
-			assert "references" in content
-			assert content["symbol"] == "player_name"
-
-	def test_find_references_in_project(self, tools, fixture_dir):
-		"""Test finding references across project."""
-		tools._set_project_root(str(fixture_dir))
-		result = tools._find_references("player_name")
+		result = tools._find_references("player_name", str(_PLAYER))
 		assert not result.isError
-		content = json.loads(result.content[0].text)
-		assert "symbol" in content
-		assert "total_references" in content
-		assert "references" in content
+		assert _payload(result)["symbol"] == "player_name"
 
 	def test_find_references_nonexistent_file(self, tools):
 		"""Test finding references in non-existent file."""
 		result = tools._find_references("symbol", "/nonexistent/file.gd")
 		assert result.isError
 
-	def test_find_references_with_no_matches(self, tools, fixture_dir):
+	@needs_player
+	def test_find_references_with_no_matches(self, tools):
 		"""Test finding references that don't exist."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools._find_references("nonexistent_symbol_xyz", str(player_file))
-			assert not result.isError
-			content = json.loads(result.content[0].text)
-			assert content["total_references"] == 0
+		result = tools._find_references("nonexistent_symbol_xyz", str(_PLAYER))
+		assert not result.isError
+		content = _payload(result)
+		assert content["total_references"] == 0
 
 
 class TestLoadGDScriptFiles:
-	def test_load_gdscript_files(self, tools, fixture_dir):
+	def test_load_gdscript_files(self, fresh_tools, fixture_dir):
 		"""Test loading GDScript files."""
-		tools.project_root = fixture_dir
-		tools._load_gdscript_files()
-		assert len(tools._gdscript_files) > 0
+		fresh_tools.project_root = fixture_dir
+		fresh_tools._load_gdscript_files()
+		assert len(fresh_tools._gdscript_files) > 0
 		# All files should have .gd extension
-		for file in tools._gdscript_files:
+		for file in fresh_tools._gdscript_files:
 			assert file.suffix == ".gd"
 
-	def test_load_gdscript_files_no_root(self, tools):
+	def test_load_gdscript_files_no_root(self, fresh_tools):
 		"""Test loading files without project root."""
-		tools.project_root = None
-		tools._load_gdscript_files()
-		assert len(tools._gdscript_files) == 0
+		fresh_tools.project_root = None
+		fresh_tools._load_gdscript_files()
+		assert len(fresh_tools._gdscript_files) == 0
 
 
 class TestToolList:
-	def test_get_tools_list(self, tools):
-		"""Test getting list of available tools."""
-		tools_list = tools.get_tools()
-		assert len(tools_list) > 0
-
-		tool_names = [tool.name for tool in tools_list]
-		assert "analyze_gdscript_file" in tool_names
-		assert "get_gdscript_structure" in tool_names
-		assert "find_gdscript_symbol" in tool_names
-		assert "get_gdscript_dependencies" in tool_names
-		assert "analyze_gdscript_code" in tool_names
-		assert "set_project_root" in tool_names
-		assert "get_project_root" in tool_names
-		assert "find_references" in tool_names
+	@pytest.mark.parametrize(
+		"name",
+		[
+			"analyze_gdscript_file",
+			"analyze_gdscript_files",
+			"get_gdscript_structure",
+			"find_gdscript_symbol",
+			"get_gdscript_dependencies",
+			"analyze_gdscript_code",
+			"set_project_root",
+			"get_project_root",
+			"find_references",
+		],
+	)
+	def test_tool_registered(self, tool_name_set, name):
+		"""Test that each tool is in the list of available tools."""
+		assert name in tool_name_set
+
+	def test_get_tools_reuses_definitions(self, tools):
+		"""Test that tool definitions are built only once."""
+		assert tools.get_tools() is tools.get_tools()
 
 
 class TestHandleToolCall:
-	def test_handle_analyze_file_tool(self, tools, fixture_dir):
+	@needs_player
+	def test_handle_analyze_file_tool(self, tools):
 		"""Test handling analyze_gdscript_file tool call."""
-		player_file = fixture_dir / "sample_player.gd"
-		if player_file.exists():
-			result = tools.handle_tool_call("analyze_gdscript_file", {"file_path": str(player_file)})
-			assert not result.isError
+		result = tools.handle_tool_call("analyze_gdscript_file", {"file_path": str(_PLAYER)})
+		assert not result.isError
 
 	def test_handle_unknown_tool(self, tools):
 		"""Test handling unknown tool."""
@@ -251,13 +315,81 @@ class TestHandleToolCall:
 		assert result.isError
 		assert "Unknown tool" in result.content[0].text
 
-	def test_handle_set_project_root_tool(self, tools, fixture_dir):
+	def test_handle_set_project_root_tool(self, project_tools, fixture_dir):
 		"""Test handling set_project_root tool call."""
-		result = tools.handle_tool_call("set_project_root", {"project_root": str(fixture_dir)})
+		result = project_tools.handle_tool_call(
+			"set_project_root", {"project_root": str(fixture_dir)}
+		)
 		assert not result.isError
 
-	def test_handle_find_references_tool(self, tools, fixture_dir):
+	def test_handle_find_references_tool(self, project_tools):
 		"""Test handling find_references tool call."""
-		tools._set_project_root(str(fixture_dir))
-		result = tools.handle_tool_call("find_references", {"symbol_name": "player_name"})
+		result = project_tools.handle_tool_call("find_references", {"symbol_name": "player_name"})
 		assert not result.isError
+
+
+class TestParseCache:
+	@needs_player
+	def test_load_tree_reuses_parse(self, tools, parsed_player):
+		"""Test that an unchanged file is parsed only once."""
+		tree, code = tools._load_tree(_PLAYER)
+		assert tree is parsed_player[0]
+		assert b"player_name" in code
+
+	def test_load_tree_reparses_modified_file(self, tools, tmp_path):
+		"""Test that a modified file is parsed again."""
+		script = tmp_path / "script.gd"
+		script.write_text("var a = 1\n")
+		tree, _ = tools._load_tree(script)
+
+		script.write_text("var a = 1\nvar b = 2\n")
+		new_tree, code = tools._load_tree(script)
+		assert new_tree is not tree
+		assert b"var b" in code
+
+	def test_analyze_empty_file(self, tools, tmp_path):
+		"""Test analyzing an empty file."""
+		script = tmp_path / "empty.gd"
+		script.write_bytes(b"")
+		result = tools._analyze_file(str(script))
+		assert not result.isError
+		assert _payload(result)["summary"]["total_functions"] == 0
+
+
+class TestResponseSchema:
+	@pytest.mark.parametrize("tool,args,keys", SCHEMAS)
+	def test_response_schema(self, project_tools, tool, args, keys):
+		"""Test that a tool response contains the expected top-level keys."""
+		result = project_tools.handle_tool_call(tool, args)
+		assert not result.isError
+		assert keys <= _payload(result).keys()
+
+
+class TestConcurrency:
+	def test_concurrent_project_root_and_references(self, fresh_tools, tmp_path):
+		"""Test that concurrent calls never see a partial or duplicated project file list."""
+		file_count = 200
+		script = "var health = 1\n\nfunc heal():\n\thealth += 1\n"
+		for i in range(file_count):
+			(tmp_path / f"script_{i}.gd").write_text(script)
+		fresh_tools._set_project_root(str(tmp_path))
+
+		def set_root(_):
+			return fresh_tools.handle_tool_call("set_project_root", {"project_root": str(tmp_path)})
+
+		def find(_):
+			return fresh_tools.handle_tool_call("find_references", {"symbol_name": "health"})
+
+		with ThreadPoolExecutor(max_workers=8) as pool:
+			set_results = []
+			find_results = []
+			for i in range(16):
+				set_results.append(pool.submit(set_root, i))
+				find_results.append(pool.submit(find, i))
+
+			for future in set_results:
+				assert _payload(future.result())["gdscript_files_count"] == file_count
+			for future in find_results:
+				assert _payload(future.result())["total_references"] == 2 * file_count
+
+		assert len(fresh_tools._gdscript_files) == file_count